@@ -1,14 +1,27 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from datetime import datetime
-from statistics import mean
-from typing import Dict, List, Optional, Tuple
+import calendar
+import os
+import random
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Tuple
 
 import httpx
-from dateutil.parser import isoparse
-from fastapi import FastAPI, HTTPException, Query
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.responses import ORJSONResponse, Response
+from numba import njit
 
 # -------------------------------
 # App configuration
@@ -17,16 +30,108 @@ PORT = 8000
 BASE_URL = "https://api.frankfurter.dev/v1"
 DEFAULT_FROM = "EUR"
 DEFAULT_TO = "USD"
-LOCAL_BACKUP = "data/sample_sk.json"  # fallback file (supports 2 shapes, see _unify_series)
+HEALTH_MSG = "✅ andveron-pherbo :white_check_mark:"
+LOCAL_BACKUP = "data/sample_sk.json"  # fallback file (3 shapes, see _index_backup)
+
+_DATE_RE = re.compile(r"\A\d{4}-\d{2}-\d{2}\Z")
+
+BreakdownT = Literal["none", "day"]
+
+# Upstream retries: delays (seconds) between attempts, so len(BACKOFF) + 1 attempts, each
+# plus up to BACKOFF_JITTER; all attempts share the overall FETCH_DEADLINE
+BACKOFF = (0.1, 0.3)
+BACKOFF_JITTER = 0.1
+FETCH_DEADLINE = 5.0
+
+# Trend arrows indexed by sign(b - a) + 1
+_ARROWS = ("↘", "➡", "↗")
+
+CACHE_MAXSIZE = 1024
+CACHE_TTL = 3600  # seconds
+
+# Bounded TTL/LRU cache of {body_none, body_day} (pre-serialized /summary bodies);
+# "latest" keys carry the UTC day so they roll over
+_cache: TTLCache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+# Ranges spanning up to MONTH_CHUNK_MAX months are fetched (and cached) per calendar month,
+# at most MONTH_FETCH_CONCURRENCY at a time; longer ranges go upstream as a single request
+MONTH_CHUNK_MAX = 12
+MONTH_FETCH_CONCURRENCY = 4
+
+# Whole calendar months of remote data: (src, dst, year, month) -> [(date, rate), ...] sorted by date
+_month_cache: TTLCache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+# In-flight loads per key so concurrent misses share one upstream fetch
+_inflight: Dict[tuple, asyncio.Task] = {}
+
+# Parsed LOCAL_BACKUP indexed by (from, to) -> Series sorted by date; reloaded when mtime changes
+_backup_index: Optional[Dict[Tuple[str, str], Series]] = None
+_backup_mtime: int = 0
+_backup_lock = threading.Lock()
+
+# Shared upstream client (created in lifespan so connections are pooled/kept alive)
+_http: Optional[httpx.AsyncClient] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _http
+    _http = httpx.AsyncClient(
+        base_url=BASE_URL,
+        timeout=12.0,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        http2=True,
+        # compressed range payloads (brotli decoding needs the httpx[brotli] extra)
+        headers={"Accept-Encoding": "gzip, br"},
+    )
+    _stats_kernel(np.array([1.0, 2.0]))  # compile (or load the cached build) before serving
+    try:
+        yield
+    finally:
+        await _http.aclose()
+        _http = None
 
-_cache: Dict[Tuple[str, Optional[str], Optional[str], str, str], dict] = {}
 
-app = FastAPI(title="SK Summary (Frankfurter-corrected)", version="1.2.0")
+app = FastAPI(
+    title="SK Summary (Frankfurter-corrected)",
+    version="1.2.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+
+# -------------------------------
+# Series (struct-of-arrays)
+# -------------------------------
+@dataclass(slots=True)
+class Series:
+    """Rates sorted by date: parallel `dates` and float64 `rates`."""
+    dates: List[str]
+    rates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+def _series_from_pairs(pairs: List[Tuple[str, float]]) -> Series:
+    return Series(
+        dates=[d for d, _ in pairs],
+        rates=np.fromiter((r for _, r in pairs), dtype=np.float64, count=len(pairs)),
+    )
 
 
 # -------------------------------
 # Utilities
 # -------------------------------
+def _valid_date(s: str) -> bool:
+    """Strict YYYY-MM-DD check (cheap regex first, then calendar validity)."""
+    if not _DATE_RE.match(s):
+        return False
+    try:
+        datetime.strptime(s, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
 def _pct_delta_safe(current: float, previous: float) -> Optional[float]:
     """Percent change with division-by-zero protection."""
     if previous == 0:
@@ -37,132 +142,253 @@ def _pct_delta_safe(current: float, previous: float) -> Optional[float]:
         return None
 
 
-async def _attempt_fetch(url: str, retries: int = 3, delay: float = 0.4) -> httpx.Response:
-    """Small retry helper."""
-    last_err = None
-    for i in range(retries):
+def _client() -> httpx.AsyncClient:
+    """The shared upstream client; a missing one is a setup error, not an upstream outage."""
+    if _http is None:
+        raise RuntimeError("upstream HTTP client not started; run the app with its lifespan")
+    return _http
+
+
+async def _attempt_fetch(client: httpx.AsyncClient, url: str) -> httpx.Response:
+    """Retry helper: exponential backoff with jitter, bounded by FETCH_DEADLINE overall."""
+    return await asyncio.wait_for(_retry_get(client, url), timeout=FETCH_DEADLINE)
+
+
+async def _retry_get(client: httpx.AsyncClient, url: str) -> httpx.Response:
+    last = len(BACKOFF)
+    # split what the sleeps leave of the deadline so a hung attempt can't starve the retries
+    per_attempt = (FETCH_DEADLINE - sum(BACKOFF) - BACKOFF_JITTER * last) / (last + 1)
+    for attempt in range(last + 1):
         try:
-            async with httpx.AsyncClient() as client:
-                res = await client.get(url, timeout=12.0)
-                res.raise_for_status()
-                return res
-        except Exception as e:
-            last_err = e
-            if i == retries - 1:
-                break
-            await asyncio.sleep(delay * (i + 1))
-    raise last_err
+            res = await client.get(url, timeout=per_attempt)
+            res.raise_for_status()
+            return res
+        except httpx.HTTPStatusError as e:
+            # client errors won't fix themselves; only retry 429/5xx
+            code = e.response.status_code
+            if (code < 500 and code != 429) or attempt == last:
+                raise
+        except httpx.TransportError:
+            if attempt == last:
+                raise
+        await asyncio.sleep(BACKOFF[attempt] + random.random() * BACKOFF_JITTER)
+
+
+async def _single_flight(cache: TTLCache, key: tuple, make: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Return cache[key], running `make` once per key on a miss. Concurrent misses
+    await the same task and receive its result or its exception.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    task = _inflight.get(key)
+    if task is None:
+
+        async def run() -> Any:
+            result = await make()
+            cache[key] = result
+            return result
+
+        def done(t: asyncio.Task) -> None:
+            if _inflight.get(key) is t:
+                del _inflight[key]
+            if not t.cancelled():
+                t.exception()  # retrieved here in case every caller went away
+
+        task = asyncio.ensure_future(run())
+        _inflight[key] = task
+        task.add_done_callback(done)
+    # shield: one caller disconnecting must not cancel the fetch the others wait on
+    return await asyncio.shield(task)
+
+
+async def _cached(key: tuple, load: Callable[[], Awaitable[Series]], pair: str) -> dict:
+    """Return the _cache entry for key, loading the series and serializing both bodies on a miss."""
+
+    async def make() -> dict:
+        series = await load()
+        bodies = _build_responses(series, pair)
+        return {
+            "body_none": orjson.dumps(bodies["none"]),
+            "body_day": orjson.dumps(bodies["day"]),
+        }
+
+    return await _single_flight(_cache, key, make)
 
 
-def _unify_series(obj: dict, to_ccy: str) -> List[dict]:
+def _unify_timeseries(obj: dict, to_ccy: str) -> Series:
+    pairs = [(d, float(m[to_ccy])) for d, m in obj["rates"].items() if to_ccy in m]
+    # Frankfurter already returns dates in order; only sort if it didn't
+    if pairs and pairs[0][0] > pairs[-1][0]:
+        pairs.sort(key=itemgetter(0))
+    return _series_from_pairs(pairs)
+
+
+def _unify_latest(obj: dict, to_ccy: str) -> Series:
+    rates = obj["rates"]
+    return _series_from_pairs([(obj["date"], float(rates[to_ccy]))] if to_ccy in rates else [])
+
+
+def _is_latest(obj: dict) -> bool:
+    return "date" in obj and "start_date" not in obj
+
+
+def _unify_series(obj: dict, to_ccy: str) -> Series:
     """
-    Convert Frankfurter responses (or our local fallback) into a list of
-    {date, rate} sorted by date.
+    Convert a Frankfurter response into a Series (dates + rates) sorted by date.
 
     Supported inputs:
       1) Frankfurter time series:
          { base, start_date, end_date, rates: {"YYYY-MM-DD": {"USD": 1.09, ...}, ...} }
       2) Frankfurter latest:
          { base, date, rates: {"USD": 1.09, ...} }
-      3) Our local fallback array:
-         { series: [ {date, from, to, rate}, ... ] }
     """
-    # 1) Time series
-    if "rates" in obj and isinstance(obj["rates"], dict):
-        rows = []
-        for d, mapping in obj["rates"].items():
-            if to_ccy in mapping:
-                rows.append({"date": d, "rate": float(mapping[to_ccy])})
-        rows.sort(key=lambda x: x["date"])
-        if rows:
-            return rows
-
-    # 2) Latest (single date)
-    if "rates" in obj and "date" in obj and isinstance(obj["rates"], dict):
-        if to_ccy in obj["rates"]:
-            return [{"date": obj["date"], "rate": float(obj["rates"][to_ccy])}]
-
-    # 3) Our local fallback shape
-    if "series" in obj and isinstance(obj["series"], list):
-        rows = [{"date": r["date"], "rate": float(r["rate"])} for r in obj["series"]]
-        rows.sort(key=lambda x: x["date"])
-        return rows
-
-    return []
+    if not isinstance(obj.get("rates"), dict):
+        return _series_from_pairs([])
+    if _is_latest(obj):
+        return _unify_latest(obj, to_ccy)
+    return _unify_timeseries(obj, to_ccy)
+
+
+def _index_backup(blob: dict) -> Dict[Tuple[str, str], Series]:
+    """
+    Group the local fallback into {(from, to): Series}. Accepts our array shape
+    { series: [ {date, from, to, rate}, ... ] } or any shape _unify_series reads.
+    """
+    if isinstance(blob.get("series"), list):
+        pairs: Dict[Tuple[str, str], List[Tuple[str, float]]] = {}
+        for r in blob["series"]:
+            pairs.setdefault((r.get("from"), r.get("to")), []).append((r["date"], float(r["rate"])))
+        return {k: _series_from_pairs(sorted(v, key=itemgetter(0))) for k, v in pairs.items()}
+    rates = blob.get("rates")
+    if not isinstance(rates, dict):
+        return {}
+    ccys = rates.keys() if _is_latest(blob) else {c for m in rates.values() for c in m}
+    return {(blob.get("base"), c): _unify_series(blob, c) for c in ccys}
+
+
+def _load_backup() -> Dict[Tuple[str, str], Series]:
+    """Parse LOCAL_BACKUP once and re-read it only when the file's mtime changes."""
+    global _backup_index, _backup_mtime
+    mtime = os.stat(LOCAL_BACKUP).st_mtime_ns
+    with _backup_lock:
+        if _backup_index is None or mtime != _backup_mtime:
+            with open(LOCAL_BACKUP, "rb") as f:
+                _backup_index = _index_backup(orjson.loads(f.read()))
+            _backup_mtime = mtime
+        return _backup_index
 
 
 # -------------------------------
 # Frankfurter fetchers (correct per docs)
 # -------------------------------
-async def _fetch_period(start: str, end: str, src: str, dst: str) -> List[dict]:
+async def _fetch_period(start: str, end: str, src: str, dst: str) -> dict:
     """
-    GET /{start}..{end}?base=SRC&symbols=DST
-    Returns unified [{date, rate}, ...]
+    Ranges spanning up to MONTH_CHUNK_MAX calendar months are assembled from cached
+    per-month GET /{YYYY-MM-01}..{YYYY-MM-last}?base=SRC&symbols=DST chunks (see _get_month);
+    longer ranges are one GET /{start}..{end}?base=SRC&symbols=DST.
+    Returns the cache entry: {body_none, body_day}
     """
-    key = ("range", start, end, src, dst)
-    if key in _cache:
-        return _cache[key]["series"]
+    return await _cached(
+        ("range", start, end, src, dst), lambda: _load_period(start, end, src, dst), f"{src}/{dst}"
+    )
 
-    url = f"{BASE_URL}/{start}..{end}?base={src}&symbols={dst}"
+
+def _months_between(start: str, end: str) -> List[Tuple[int, int]]:
+    y, m = int(start[:4]), int(start[5:7])
+    end_y, end_m = int(end[:4]), int(end[5:7])
+    months = []
+    while (y, m) <= (end_y, end_m):
+        months.append((y, m))
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return months
+
+
+async def _get_month(src: str, dst: str, year: int, month: int) -> List[Tuple[str, float]]:
+    """
+    GET /{YYYY-MM-01}..{YYYY-MM-last}?base=SRC&symbols=DST, cached per calendar month
+    so overlapping ranges share upstream round-trips.
+    """
+
+    async def load() -> List[Tuple[str, float]]:
+        first = f"{year:04d}-{month:02d}-01"
+        last = calendar.monthrange(year, month)[1]
+        url = f"/{first}..{year:04d}-{month:02d}-{last:02d}?base={src}&symbols={dst}"
+        try:
+            res = await _attempt_fetch(_client(), url)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return []  # no data for this month (before 1999 or not yet published)
+            raise
+        unified = _unify_series(orjson.loads(res.content), dst)
+        # a non-business 1st makes Frankfurter start at the previous month's last business day;
+        # that row belongs to the previous chunk
+        lo = bisect_left(unified.dates, first)
+        return list(zip(unified.dates[lo:], unified.rates[lo:].tolist()))
+
+    return await _single_flight(_month_cache, ("month", src, dst, year, month), load)
+
+
+async def _load_period(start: str, end: str, src: str, dst: str) -> Series:
+    client = _client()  # outside the try: must not fall back to the local file
     try:
-        res = await _attempt_fetch(url)
-        data = res.json()
-        series = _unify_series(data, dst)
-        _cache[key] = {"series": series, "source": "remote"}
-        return series
+        months = _months_between(start, end)
+        if len(months) > MONTH_CHUNK_MAX:
+            res = await _attempt_fetch(client, f"/{start}..{end}?base={src}&symbols={dst}")
+            unified = _unify_series(orjson.loads(res.content), dst)
+            rows = list(zip(unified.dates, unified.rates.tolist()))
+        else:
+            sem = asyncio.Semaphore(MONTH_FETCH_CONCURRENCY)
+
+            async def month(y: int, m: int) -> List[Tuple[str, float]]:
+                async with sem:
+                    return await _get_month(src, dst, y, m)
+
+            # a failing month cancels the wrappers still queued on the semaphore
+            async with asyncio.TaskGroup() as tg:
+                chunks = [tg.create_task(month(y, m)) for y, m in months]
+            rows = [r for chunk in chunks for r in chunk.result()]
+        lo = bisect_left(rows, start, key=itemgetter(0))
+        hi = bisect_right(rows, end, key=itemgetter(0))
+        return _series_from_pairs(rows[lo:hi])
     except Exception:
         # fallback to local file (supports both shapes)
         try:
-            with open(LOCAL_BACKUP, "r", encoding="utf-8") as f:
-                blob = json.load(f)
-            # If local is array-shape, filter by date & pair
-            if "series" in blob:
-                filtered = [
-                    x for x in blob["series"]
-                    if start <= x["date"] <= end and x.get("from") == src and x.get("to") == dst
-                ]
-                series = _unify_series({"series": filtered}, dst)
-            else:
-                # If local mimics Frankfurter, just unify+slice by date
-                series = [r for r in _unify_series(blob, dst) if start <= r["date"] <= end]
-            _cache[key] = {"series": series, "source": "fallback-file"}
-            return series
+            indexed = (await asyncio.to_thread(_load_backup)).get((src, dst))
+            if indexed is None:
+                return _series_from_pairs([])
+            # ISO dates sort lexicographically, so the window is two binary searches
+            lo = bisect_left(indexed.dates, start)
+            hi = bisect_right(indexed.dates, end)
+            return Series(dates=indexed.dates[lo:hi], rates=indexed.rates[lo:hi])
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"Remote + local failed: {e}")
 
 
-async def _fetch_latest(src: str, dst: str) -> List[dict]:
+async def _fetch_latest(src: str, dst: str) -> dict:
     """
     GET /latest?base=SRC&symbols=DST
-    Returns unified single-element [{date, rate}]
+    Returns the cache entry: {body_none, body_day} built from a single-item Series
     """
-    key = ("latest", None, None, src, dst)
-    if key in _cache:
-        return _cache[key]["series"]
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    return await _cached(
+        ("latest", None, None, src, dst, today), lambda: _load_latest(src, dst), f"{src}/{dst}"
+    )
 
-    url = f"{BASE_URL}/latest?base={src}&symbols={dst}"
+
+async def _load_latest(src: str, dst: str) -> Series:
+    client = _client()  # outside the try: must not fall back to the local file
+    url = f"/latest?base={src}&symbols={dst}"
     try:
-        res = await _attempt_fetch(url)
-        data = res.json()
-        series = _unify_series(data, dst)  # should be one item
-        _cache[key] = {"series": series, "source": "remote"}
-        return series
+        res = await _attempt_fetch(client, url)
+        data = orjson.loads(res.content)
+        return _unify_series(data, dst)  # should be one item
     except Exception:
         # fallback: take newest line from local file for src/dst
         try:
-            with open(LOCAL_BACKUP, "r", encoding="utf-8") as f:
-                blob = json.load(f)
-            if "series" in blob:
-                filt = [x for x in blob["series"] if x.get("from") == src and x.get("to") == dst]
-                filt.sort(key=lambda x: x["date"])
-                last = filt[-1]
-                series = [{"date": last["date"], "rate": float(last["rate"])}]
-            else:
-                # Frankfurter-like local
-                all_rows = _unify_series(blob, dst)
-                series = all_rows[-1:] if all_rows else []
-            _cache[key] = {"series": series, "source": "fallback-file"}
-            return series
+            indexed = (await asyncio.to_thread(_load_backup))[(src, dst)]
+            return Series(dates=indexed.dates[-1:], rates=indexed.rates[-1:])
         except Exception as e:
             raise HTTPException(status_code=502, detail=f"Remote + local failed: {e}")
 
@@ -170,113 +396,122 @@ async def _fetch_latest(src: str, dst: str) -> List[dict]:
 # -------------------------------
 # Data shaping
 # -------------------------------
-def _daily_delta(series: List[dict]) -> List[dict]:
-    out = []
-    prev = None
-    for s in series:
-        val = float(s["rate"])
-        pct = _pct_delta_safe(val, prev) if prev is not None else None
-        out.append({"date": s["date"], "rate": val, "pct_change": pct})
-        prev = val
-    return out
-
-
-def _summarize(series: List[dict]) -> dict:
-    if not series:
-        return {"start_rate": None, "end_rate": None, "total_pct_change": None, "mean_rate": None}
-    start_r = float(series[0]["rate"])
-    end_r = float(series[-1]["rate"])
+@njit(cache=True)
+def _stats_kernel(rates):
+    """
+    One compiled pass over a non-empty float64 array:
+    (pct_change[n] with NaN for first/zero-previous, arrows[n-1] in {-1, 0, 1}, mean, start, end)
+    """
+    n = rates.size
+    pct = np.empty(n)
+    pct[0] = np.nan
+    arrows = np.empty(n - 1, np.int8)
+    for i in range(1, n):
+        a = rates[i - 1]
+        b = rates[i]
+        pct[i] = (b - a) / a * 100.0 if a != 0.0 else np.nan
+        arrows[i - 1] = 1 if b > a else (-1 if b < a else 0)
+    return pct, arrows, rates.mean(), rates[0], rates[n - 1]
+
+
+def mini_trendpath(series: Series, rates: List[float], arrows: List[int]) -> str:
+    """
+    Emoji trendline:
+      2025-07-01→2025-07-03 | 💹 1.0900 ↗ 1.1020 ↘ 1.0975
+    """
+    parts = [f"{series.dates[0]}→{series.dates[-1]} | 💹 {rates[0]:.4f}"]
+    parts.extend(f"{_ARROWS[a + 1]} {b:.4f}" for a, b in zip(arrows, rates[1:]))
+    return " ".join(parts)
+
+
+def _delta_rows(series: Series, rates: List[float], pct: np.ndarray) -> List[dict]:
+    return [
+        {"date": d, "rate": r, "pct_change": None if p != p else p}
+        for d, r, p in zip(series.dates, rates, pct.tolist())
+    ]
+
+
+def _summarize(start_r: float, end_r: float, mean_r: float) -> dict:
     return {
         "start_rate": start_r,
         "end_rate": end_r,
         "total_pct_change": _pct_delta_safe(end_r, start_r),
-        "mean_rate": mean([float(x["rate"]) for x in series]),
+        "mean_rate": mean_r,
     }
 
 
-def mini_trendpath(series: List[dict]) -> str:
-    """
-    Emoji trendline:
-      2025-07-01→2025-07-03 | 💹 1.0900 ↗ 1.1020 ↘ 1.0975
-    """
-    if not series:
-        return "(no data)"
-    parts = [f"{series[0]['date']}→{series[-1]['date']} | 💹 {float(series[0]['rate']):.4f}"]
-    for a, b in zip(series, series[1:]):
-        ra, rb = float(a["rate"]), float(b["rate"])
-        arrow = "↗" if rb > ra else ("↘" if rb < ra else "➡")
-        parts.append(f"{arrow} {rb:.4f}")
-    return " ".join(parts)
+def _build_responses(series: Series, pair: str) -> Dict[BreakdownT, dict]:
+    """Both /summary bodies ("none" and "day") from a single kernel pass."""
+    if not len(series):
+        stats = {"start_rate": None, "end_rate": None, "total_pct_change": None, "mean_rate": None}
+        rows: List[dict] = []
+        trendline = "(no data)"
+    else:
+        pct, arrows, mean_r, start_r, end_r = _stats_kernel(series.rates)
+        rates = series.rates.tolist()  # each rate converted once, shared by rows and trendline
+        stats = _summarize(float(start_r), float(end_r), float(mean_r))
+        rows = _delta_rows(series, rates, pct)
+        trendline = mini_trendpath(series, rates, arrows.tolist())
+    return {
+        "none": {
+            "mode": "none",
+            "pair": pair,
+            **stats,
+            "trendline": trendline,
+            "source": "remote_or_fallback",
+        },
+        "day": {
+            "mode": "day",
+            "pair": pair,
+            "series": rows,
+            "trendline": trendline,
+            "source": "remote_or_fallback",
+        },
+    }
 
 
 # -------------------------------
 # Endpoints
 # -------------------------------
+@lru_cache(maxsize=1)
+def _utc_stamp(epoch_s: int) -> str:
+    """ISO-8601 UTC timestamp, formatted at most once per second."""
+    return datetime.fromtimestamp(epoch_s, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
 @app.get("/health")
 def health():
     return {
         "status": "ok",
-        "time": datetime.utcnow().isoformat() + "Z",
-        "message": "✅ andveron-pherbo :white_check_mark:"
+        "time": _utc_stamp(int(time.time())),
+        "message": HEALTH_MSG,
     }
 
 
+def _breakdown(breakdown: str = Query("none", pattern="^(none|day|daily)$")) -> BreakdownT:
+    """Query param `breakdown`, with the "daily" alias folded into "day"."""
+    return "day" if breakdown == "daily" else breakdown
+
+
 @app.get("/summary")
 async def summary(
     start: Optional[str] = Query(None, description="YYYY-MM-DD"),
     end: Optional[str] = Query(None, description="YYYY-MM-DD"),
-    breakdown: str = Query("none", pattern="^(none|day|daily)$"),
+    breakdown: BreakdownT = Depends(_breakdown),
     from_ccy: str = Query(DEFAULT_FROM),
     to_ccy: str = Query(DEFAULT_TO),
 ):
-    # normalize
-    breakdown = "day" if breakdown == "daily" else breakdown
-
     # Validate dates when provided
     if start and end:
-        try:
-            _ = isoparse(start)
-            _ = isoparse(end)
-        except Exception:
+        if not (_valid_date(start) and _valid_date(end)):
             raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
-
-        series = await _fetch_period(start, end, from_ccy, to_ccy)
-
-        if breakdown == "day":
-            return {
-                "mode": "day",
-                "pair": f"{from_ccy}/{to_ccy}",
-                "series": _daily_delta(series),
-                "trendline": mini_trendpath(series),
-                "source": "remote_or_fallback",
-            }
-        else:
-            return {
-                "mode": "none",
-                "pair": f"{from_ccy}/{to_ccy}",
-                **_summarize(series),
-                "trendline": mini_trendpath(series),
-                "source": "remote_or_fallback",
-            }
-
-    # No range → use latest
-    latest_series = await _fetch_latest(from_ccy, to_ccy)  # one item
-    if breakdown == "day":
-        return {
-            "mode": "day",
-            "pair": f"{from_ccy}/{to_ccy}",
-            "series": _daily_delta(latest_series),
-            "trendline": mini_trendpath(latest_series),
-            "source": "remote_or_fallback",
-        }
+        entry = await _fetch_period(start, end, from_ccy, to_ccy)
     else:
-        return {
-            "mode": "none",
-            "pair": f"{from_ccy}/{to_ccy}",
-            **_summarize(latest_series),
-            "trendline": mini_trendpath(latest_series),
-            "source": "remote_or_fallback",
-        }
+        # No range → use latest (one item)
+        entry = await _fetch_latest(from_ccy, to_ccy)
+
+    # bodies are serialized once per cache entry
+    return Response(content=entry["body_" + breakdown], media_type="application/json")
 
 
 # -------------------------------
@@ -284,5 +519,5 @@ async def summary(
 # -------------------------------
 if __name__ == "__main__":
     import uvicorn
-    print("✅ andveron-pherbo :white_check_mark:")
+    print(HEALTH_MSG)
     uvicorn.run("main:app", host="0.0.0.0", port=PORT, reload=True)
@@ -1,8 +1,14 @@
 # tests/test_app.py
+import asyncio
 import json
 import logging
+import os
+from datetime import date, timedelta
 from typing import Iterable
 
+import httpx
+import pytest
+from cachetools import TTLCache
 from fastapi.testclient import TestClient
 import main
 
@@ -14,6 +20,13 @@ log = logging.getLogger("tests.fx")
 client = TestClient(main.app)
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _lifespan():
+    # run startup/shutdown so the shared upstream client exists
+    with client:
+        yield
+
+
 def _have_keys(d: dict, keys: Iterable[str]) -> bool:
     return all(k in d for k in keys)
 
@@ -101,3 +114,297 @@ def test_summary_range_none(caplog):
         assert key in body, f"Missing '{key}' in response:\n{_pp(body)}"
     log.info("SUMMARY: start=%.6f end=%.6f mean=%.6f total_pct=%s",
              body["start_rate"], body["end_rate"], body["mean_rate"], body["total_pct_change"])
+
+
+def test_daily_delta_zero_previous():
+    series = main._series_from_pairs([("2025-07-01", 0.0), ("2025-07-02", 1.0), ("2025-07-03", 1.5)])
+    rows = main._build_responses(series, "EUR/USD")["day"]["series"]
+    log.info("ZERO-PREV: %s", _pp(rows))
+
+    assert [r["pct_change"] for r in rows] == [None, None, 50.0], f"Unexpected deltas:\n{_pp(rows)}"
+
+
+def test_unify_series_shapes():
+    latest = {"base": "EUR", "date": "2025-07-03", "rates": {"USD": 1.0975}}
+    ranged = {
+        "base": "EUR", "start_date": "2025-07-01", "end_date": "2025-07-02",
+        "rates": {"2025-07-01": {"USD": 1.09}, "2025-07-02": {"USD": 1.102}},
+    }
+
+    s = main._unify_series(latest, "USD")
+    assert s.dates == ["2025-07-03"] and s.rates.tolist() == [1.0975]
+    assert main._unify_series(ranged, "USD").dates == ["2025-07-01", "2025-07-02"]
+    assert len(main._unify_series(latest, "GBP")) == 0
+
+
+def test_summary_rejects_bad_dates():
+    for start in ("2025-7-01", "2025-02-30", "2025-07-01T00:00:00"):
+        r = client.get(f"/summary?start={start}&end=2025-07-03")
+        assert r.status_code == 400, f"{start!r} accepted:\n{_pp(r.text)}"
+
+
+def test_single_flight_shares_result_and_error():
+    calls = 0
+
+    async def fail():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def ok():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run(make):
+        cache = TTLCache(maxsize=4, ttl=60)
+        return await asyncio.gather(
+            *[main._single_flight(cache, ("k",), make) for _ in range(20)], return_exceptions=True
+        ), cache
+
+    results, cache = asyncio.run(run(fail))
+    assert calls == 1 and all(isinstance(r, RuntimeError) for r in results) and not cache
+    assert not main._inflight, "in-flight entry left behind after failure"
+
+    calls = 0
+    results, cache = asyncio.run(run(ok))
+    assert calls == 1 and results == ["value"] * 20 and cache[("k",)] == "value"
+    assert not main._inflight
+
+
+# --- upstream mock mimicking Frankfurter range semantics ---
+def _frankfurter(calls: list, last_day: str = "2025-09-30", fail: Iterable[str] = ()):
+    """Weekday rates up to `last_day`; a weekend start moves back to the previous business day,
+    ranges starting after `last_day` 404, and ranges starting with a prefix in `fail` 500."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        a, b = request.url.path.rsplit("/", 1)[-1].split("..")
+        calls.append((a, b))
+        if any(a.startswith(f) for f in fail):
+            return httpx.Response(500)
+        if a > last_day:
+            return httpx.Response(404, json={"message": "not found"})
+        d, stop = date.fromisoformat(a), date.fromisoformat(min(b, last_day))
+        while d.weekday() >= 5:
+            d -= timedelta(days=1)
+        rates = {}
+        while d <= stop:
+            if d.weekday() < 5:
+                rates[d.isoformat()] = {"USD": 1 + d.toordinal() % 100 / 1000}
+            d += timedelta(days=1)
+        return httpx.Response(200, json={"base": "EUR", "start_date": a, "end_date": b, "rates": rates})
+
+    return handler
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Point the fetchers at a mock Frankfurter; returns a runner for _load_period."""
+    main._cache.clear()
+    main._month_cache.clear()
+    monkeypatch.setattr(main, "BACKOFF", (0.0, 0.0))
+    monkeypatch.setattr(main, "BACKOFF_JITTER", 0.0)
+
+    def run(handler, start: str, end: str):
+        async def go():
+            async with httpx.AsyncClient(base_url=main.BASE_URL, transport=httpx.MockTransport(handler)) as c:
+                monkeypatch.setattr(main, "_http", c)
+                return await main._load_period(start, end, "EUR", "USD")
+
+        return asyncio.run(go())
+
+    yield run
+    main._cache.clear()
+    main._month_cache.clear()
+
+
+def test_period_month_chunks_stitch_without_duplicates(upstream):
+    calls = []
+    # 2025-06-01 is a Sunday, so the June chunk comes back starting at Friday 2025-05-30
+    s = upstream(_frankfurter(calls), "2025-05-01", "2025-06-10")
+    log.info("STITCH: %d rows, calls=%s", len(s), calls)
+
+    assert s.dates.count("2025-05-30") == 1, f"Duplicate boundary row:\n{s.dates}"
+    assert s.dates == sorted(set(s.dates)), f"Dates not unique/sorted:\n{s.dates}"
+    assert s.dates[0] >= "2025-05-01" and s.dates[-1] <= "2025-06-10"
+    assert len(calls) == 2, f"Expected one request per month: {calls}"
+
+
+def test_period_long_range_is_one_request(upstream):
+    calls = []
+    s = upstream(_frankfurter(calls), "2000-01-01", "2025-06-10")
+
+    assert calls == [("2000-01-01", "2025-06-10")], f"Long range was chunked: {len(calls)} calls"
+    assert s.dates[0] >= "2000-01-01" and s.dates[-1] == "2025-06-10"
+
+
+def test_period_month_without_data_is_empty_chunk(upstream):
+    calls = []
+    # October/November 404 upstream (past the mock's last published day)
+    s = upstream(_frankfurter(calls, last_day="2025-09-30"), "2025-09-01", "2025-11-30")
+    log.info("EMPTY-MONTH: %d rows, calls=%s", len(s), calls)
+
+    assert len(calls) == 3, f"Expected one request per month: {calls}"
+    assert s.dates and s.dates[0] >= "2025-09-01" and s.dates[-1] == "2025-09-30", \
+        f"Fell back instead of using the September data:\n{s.dates}"
+
+
+def test_period_month_fetches_are_bounded(upstream):
+    calls, active, peak = [], 0, 0
+    sync_handler = _frankfurter(calls)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return sync_handler(request)
+
+    upstream(handler, "2024-10-01", "2025-09-30")
+
+    assert len(calls) == main.MONTH_CHUNK_MAX
+    assert peak <= main.MONTH_FETCH_CONCURRENCY, f"{peak} concurrent upstream requests"
+
+
+def test_period_overlapping_ranges_reuse_months(upstream):
+    calls = []
+    handler = _frankfurter(calls)
+    first = upstream(handler, "2025-07-01", "2025-07-10")
+    second = upstream(handler, "2025-07-05", "2025-08-15")
+
+    assert [c[0] for c in calls] == ["2025-07-01", "2025-08-01"], f"July fetched twice: {calls}"
+    assert first.dates[0] == "2025-07-01" and first.dates[-1] == "2025-07-10"
+    assert second.dates[0] == "2025-07-07" and second.dates[-1] == "2025-08-15"  # 07-05 is a Saturday
+
+
+def test_period_failing_month_falls_back_to_file(upstream):
+    calls = []
+    s = upstream(_frankfurter(calls, fail=("2025-07",)), "2025-06-15", "2025-07-03")
+    log.info("FAILED-MONTH: %s calls=%s", s.dates, calls)
+
+    # data/sample_sk.json holds 2025-07-01..2025-07-03
+    assert s.dates == ["2025-07-01", "2025-07-02", "2025-07-03"], f"Expected fallback rows:\n{s.dates}"
+    assert ("month", "EUR", "USD", 2025, 7) not in main._month_cache, "failed month was cached"
+    assert ("month", "EUR", "USD", 2025, 6) in main._month_cache, "healthy month not cached"
+
+
+def test_missing_client_is_not_an_outage(monkeypatch):
+    # without the lifespan there is no client; that must not be served from the fallback file
+    monkeypatch.setattr(main, "_http", None)
+    for load in (main._load_latest("EUR", "USD"), main._load_period("2025-07-01", "2025-07-03", "EUR", "USD")):
+        with pytest.raises(RuntimeError, match="lifespan"):
+            asyncio.run(load)
+
+
+def test_backup_shapes_and_mtime_reload(tmp_path, monkeypatch):
+    path = tmp_path / "backup.json"
+    monkeypatch.setattr(main, "LOCAL_BACKUP", str(path))
+    monkeypatch.setattr(main, "_backup_index", None)
+    monkeypatch.setattr(main, "_backup_mtime", 0)
+
+    path.write_text(json.dumps({"base": "EUR", "date": "2025-07-03", "rates": {"USD": 1.0975}}))
+    latest = main._load_backup()[("EUR", "USD")]
+    assert latest.dates == ["2025-07-03"] and latest.rates.tolist() == [1.0975]
+    assert main._load_backup() is main._load_backup(), "unchanged file was re-parsed"
+
+    path.write_text(json.dumps({
+        "base": "EUR", "start_date": "2025-07-01", "end_date": "2025-07-02",
+        "rates": {"2025-07-01": {"USD": 1.09, "GBP": 0.85}, "2025-07-02": {"USD": 1.102}},
+    }))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))  # guarantee a new mtime
+    index = main._load_backup()
+    assert index[("EUR", "USD")].dates == ["2025-07-01", "2025-07-02"], "file change not picked up"
+    assert index[("EUR", "GBP")].rates.tolist() == [0.85]
+
+
+def _attempt_with(handler):
+    """Run main._attempt_fetch against a mock transport; returns (response or exception, seconds)."""
+
+    async def go():
+        async with httpx.AsyncClient(base_url=main.BASE_URL, transport=httpx.MockTransport(handler)) as c:
+            t0 = asyncio.get_running_loop().time()
+            try:
+                out = await main._attempt_fetch(c, "/latest")
+            except Exception as e:
+                out = e
+            return out, asyncio.get_running_loop().time() - t0
+
+    return asyncio.run(go())
+
+
+@pytest.mark.parametrize("code", [500, 503, 429])
+def test_retry_transient_status(upstream, code):
+    calls = []
+    out, _ = _attempt_with(lambda req: calls.append(req) or httpx.Response(code))
+
+    assert isinstance(out, httpx.HTTPStatusError) and out.response.status_code == code
+    assert len(calls) == len(main.BACKOFF) + 1, f"{code}: {len(calls)} attempts"
+
+    calls.clear()
+    out, _ = _attempt_with(
+        lambda req: calls.append(req) or httpx.Response(code if len(calls) <= len(main.BACKOFF) else 200)
+    )
+    assert out.status_code == 200 and len(calls) == len(main.BACKOFF) + 1
+
+
+def test_retry_skips_client_errors(upstream):
+    calls = []
+    out, _ = _attempt_with(lambda req: calls.append(req) or httpx.Response(404))
+
+    assert isinstance(out, httpx.HTTPStatusError) and len(calls) == 1, f"404 retried {len(calls)} times"
+
+
+def test_retry_hung_attempts_fit_deadline(upstream, monkeypatch):
+    monkeypatch.setattr(main, "FETCH_DEADLINE", 0.6)
+    calls = []
+
+    async def times_out(request: httpx.Request) -> httpx.Response:
+        # what a real transport does with a hung upstream: give up after the per-attempt timeout
+        calls.append(request)
+        await asyncio.sleep(request.extensions["timeout"]["read"])
+        raise httpx.ReadTimeout("hung", request=request)
+
+    out, took = _attempt_with(times_out)
+    # the last attempt may end right on the deadline, so either timeout is fine here
+    assert isinstance(out, (httpx.ReadTimeout, asyncio.TimeoutError))
+    assert len(calls) == len(main.BACKOFF) + 1, f"{len(calls)} attempts before giving up"
+    assert took <= main.FETCH_DEADLINE + 0.1
+
+    async def hangs(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(60)
+
+    out, took = _attempt_with(hangs)
+    assert isinstance(out, asyncio.TimeoutError) and took < main.FETCH_DEADLINE + 0.1, f"cut off after {took:.2f}s"
+
+
+def test_period_failing_month_stops_queued_fetches(upstream, monkeypatch):
+    calls = []
+    sync_handler = _frankfurter(calls, fail=("2024-10",))
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if "2024-10" not in request.url.path:
+            await asyncio.sleep(0.2)
+        return sync_handler(request)
+
+    async def go():
+        async with httpx.AsyncClient(base_url=main.BASE_URL, transport=httpx.MockTransport(handler)) as c:
+            monkeypatch.setattr(main, "_http", c)
+            await main._load_period("2024-10-01", "2025-09-30", "EUR", "USD")
+            await asyncio.sleep(1.0)  # give any leaked month fetches time to run
+
+    asyncio.run(go())
+    months = {a[:7] for a, _ in calls}
+    # the first wave, plus at most the one waiter the failing month's semaphore release woke
+    assert len(months) <= main.MONTH_FETCH_CONCURRENCY + 1, f"months fetched after the failure: {sorted(months)}"
+
+
+def test_summary_breakdown_values():
+    r = client.get("/summary?start=2025-07-01&end=2025-07-03&breakdown=daily")
+    assert r.status_code == 200 and r.json().get("mode") == "day", f"'daily' alias broken:\n{_pp(r.text)}"
+
+    r = client.get("/summary?breakdown=weekly")
+    assert r.status_code == 422, f"Invalid breakdown accepted:\n{_pp(r.text)}"